@@ -5,16 +5,21 @@ Main Flask application providing web-based code editing capabilities
 """
 
 import os
-import json
+import re
+import orjson
 import subprocess
 import tempfile
+import time
 from pathlib import Path
-from flask import Flask, render_template, request, jsonify, send_from_directory
+from flask import Flask, Response, render_template, request, send_from_directory, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 from utils.llama_client import LlamaClient
+from utils.batching_llama_client import BatchingLlamaClient
 from utils.code_executor import CodeExecutor
 from utils.file_manager import FileManager
+from utils.response_cache import ResponseCache
+from utils.semantic_cache import SemanticCache
 
 # Load environment variables
 load_dotenv()
@@ -26,77 +31,238 @@ CORS(app)
 WORKSPACE_DIR = os.getenv('WORKSPACE_DIR', './workspace')
 OLLAMA_API_URL = os.getenv('OLLAMA_API_URL', 'http://localhost:11434')
 OLLAMA_MODEL = os.getenv('OLLAMA_MODEL', 'llama3:latest')
+OLLAMA_EMBED_MODEL = os.getenv('OLLAMA_EMBED_MODEL', 'nomic-embed-text')
+RESPONSE_CACHE_DB = os.getenv('RESPONSE_CACHE_DB', './.cache/llm_cache.db')
+RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '512'))
+SEMANTIC_CACHE_SIZE = int(os.getenv('SEMANTIC_CACHE_SIZE', '0'))
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.95'))
+SEMANTIC_CACHE_RETRY_SECONDS = float(os.getenv('SEMANTIC_CACHE_RETRY_SECONDS', '60'))
+SEARCH_INDEX_DB = os.getenv('SEARCH_INDEX_DB', './.cache/search_index.db')
+EXECUTOR_POOL_SIZE = int(os.getenv('EXECUTOR_POOL_SIZE', '2'))
+OLLAMA_MAX_BATCH = int(os.getenv('OLLAMA_MAX_BATCH', '8'))
+OLLAMA_BATCH_WINDOW_MS = int(os.getenv('OLLAMA_BATCH_WINDOW_MS', '0'))
+OLLAMA_KEEP_ALIVE = os.getenv('OLLAMA_KEEP_ALIVE', '10m')
+OLLAMA_POOL_SIZE = int(os.getenv('OLLAMA_POOL_SIZE', '32'))
 
 # Initialize components
-llama_client = LlamaClient(OLLAMA_API_URL, OLLAMA_MODEL)
-code_executor = CodeExecutor()
-file_manager = FileManager(WORKSPACE_DIR)
+# Keep-alive connections kept for reuse; size it for the concurrent Ollama calls expected
+# per process (gevent workers can serve many requests at once)
+llama_client = LlamaClient(OLLAMA_API_URL, OLLAMA_MODEL, OLLAMA_EMBED_MODEL,
+                           pool_maxsize=max(OLLAMA_POOL_SIZE, 1),
+                           keep_alive=OLLAMA_KEEP_ALIVE)
+if OLLAMA_BATCH_WINDOW_MS > 0:
+    llama_client = BatchingLlamaClient(
+        llama_client,
+        max_batch=OLLAMA_MAX_BATCH,
+        max_wait=OLLAMA_BATCH_WINDOW_MS / 1000
+    )
+code_executor = CodeExecutor(pool_size=EXECUTOR_POOL_SIZE)
+file_manager = FileManager(WORKSPACE_DIR, index_path=SEARCH_INDEX_DB)
+response_cache = ResponseCache(RESPONSE_CACHE_DB, maxsize=RESPONSE_CACHE_SIZE)
+semantic_cache = None
+# Embedding lookups are skipped until this time.monotonic() value after a failure
+semantic_cache_paused_until = 0.0
+if SEMANTIC_CACHE_SIZE > 0:
+    semantic_cache = SemanticCache(
+        RESPONSE_CACHE_DB,
+        model=f"{OLLAMA_MODEL}|{OLLAMA_EMBED_MODEL}",
+        threshold=SEMANTIC_CACHE_THRESHOLD,
+        maxsize=SEMANTIC_CACHE_SIZE
+    )
 
 # Ensure workspace directory exists
 os.makedirs(WORKSPACE_DIR, exist_ok=True)
 
+def ojson(obj, status=200):
+    """Build a JSON response encoded with orjson"""
+    return app.response_class(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def request_json():
+    """Decode the JSON request body with orjson"""
+    return orjson.loads(request.get_data() or b'{}')
+
+# Common errors answered with templated fixes instead of a LLaMA3 call
+_FIX_TABLE = [
+    (re.compile(r"ModuleNotFoundError: No module named '(\w+)"), [
+        "Install the missing package: `pip install {0}`",
+        "Check that '{0}' is spelled correctly and is available in this Python environment",
+    ]),
+    (re.compile(r"NameError: name '(\w+)' is not defined"), [
+        "Define '{0}' before it is used, or check it for typos",
+        "If '{0}' comes from a module, add the missing import",
+    ]),
+    (re.compile(r"TabError: (.+)"), [
+        "Fix the indentation: {0}",
+        "Indent with 4 spaces and do not mix tabs and spaces",
+    ]),
+    (re.compile(r"IndentationError: (.+)"), [
+        "Fix the indentation: {0}",
+        "Indent each block consistently with 4 spaces",
+    ]),
+    (re.compile(r"ZeroDivisionError: (.+)"), [
+        "Check that the divisor is not zero before dividing ({0})",
+    ]),
+]
+
+def known_error_fixes(error):
+    """Return templated fixes when the error matches a known pattern"""
+    for pattern, templates in _FIX_TABLE:
+        match = pattern.search(error)
+        if match:
+            return [template.format(*match.groups()) for template in templates]
+    return None
+
+def _is_cacheable(result):
+    """Only successful LLaMA3 responses are worth caching"""
+    if isinstance(result, dict):
+        return 'error' not in result
+    return bool(result) and not result[0].startswith(('Error getting', 'No suggestions', 'No fixes'))
+
+def cache_namespace():
+    """Cache namespace of the current request
+    
+    Identical requests in one namespace get the same reply; separate
+    namespaces get independently sampled replies.
+    """
+    return request.headers.get('X-Cache-Namespace') or request.cookies.get('cache_namespace', '')
+
+def _cache_key(route, code, context):
+    """Content-addressed key for a LLaMA3 request"""
+    return ResponseCache.make_key(cache_namespace(), route, OLLAMA_MODEL, code, context)
+
+def cached_llm_call(route, code, context, compute):
+    """Return the cached LLaMA3 response for an identical request, computing it on a miss"""
+    key = _cache_key(route, code, context)
+    result = response_cache.get(key)
+    if result is None:
+        result = compute()
+        if _is_cacheable(result):
+            response_cache.set(key, result)
+    return result
+
+def lookup_suggestions(code, context):
+    """Find cached suggestions by exact request, then by near-identical code
+    
+    Returns (key, embedding, suggestions); suggestions is None on a miss.
+    """
+    key = _cache_key('suggest', code, context)
+    suggestions = response_cache.get(key)
+    embedding = None
+    
+    if suggestions is None and semantic_cache is not None and time.monotonic() >= semantic_cache_paused_until:
+        embedding = llama_client.get_embedding(f"{context}\n{code}")
+        if embedding is None:
+            # Back off so a missing or still-loading embedding model does not slow every request
+            pause_semantic_cache()
+        else:
+            suggestions = semantic_cache.lookup(embedding, cache_namespace())
+            if suggestions is not None:
+                response_cache.set(key, suggestions)
+    
+    return key, embedding, suggestions
+
+def pause_semantic_cache():
+    """Skip embedding requests for a while after the embedding model failed to answer"""
+    global semantic_cache_paused_until
+    semantic_cache_paused_until = time.monotonic() + SEMANTIC_CACHE_RETRY_SECONDS
+    print(f"Semantic cache paused for {SEMANTIC_CACHE_RETRY_SECONDS:g}s: no embeddings from {OLLAMA_EMBED_MODEL}")
+
+def remember_suggestions(key, embedding, suggestions):
+    """Cache freshly generated suggestions for exact and near-identical requests"""
+    if not _is_cacheable(suggestions):
+        return
+    
+    response_cache.set(key, suggestions)
+    if embedding is not None:
+        semantic_cache.add(embedding, suggestions, cache_namespace())
+
+def _ndjson(obj):
+    """Encode one newline-delimited JSON record"""
+    return orjson.dumps(obj) + b'\n'
+
+def stream_suggestions(code, context):
+    """Stream LLaMA3 suggestion text as NDJSON records, serving repeats from cache"""
+    key, embedding, suggestions = lookup_suggestions(code, context)
+    
+    if suggestions is None:
+        chunks = []
+        try:
+            for text in llama_client.stream_suggestions(code, context):
+                chunks.append(text)
+                yield _ndjson({'response': text})
+        except Exception as e:
+            yield _ndjson({'error': str(e)})
+            return
+        
+        suggestions = LlamaClient.split_suggestions(''.join(chunks))
+        remember_suggestions(key, embedding, suggestions)
+    else:
+        yield _ndjson({'response': '\n'.join(suggestions)})
+    
+    yield _ndjson({'done': True, 'suggestions': suggestions})
+
 @app.route('/')
 def index():
     """Main editor interface"""
     return render_template('index.html')
 
 @app.route('/api/files', methods=['GET'])
-def list_files():
+async def list_files():
     """List all files in the workspace"""
     try:
-        files = file_manager.list_files()
-        return jsonify({'success': True, 'files': files})
+        files = await file_manager.list_files_async()
+        return ojson({'success': True, 'files': files})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/files', methods=['POST'])
-def create_file():
+async def create_file():
     """Create or save a file"""
     try:
-        data = request.get_json()
+        data = request_json()
         file_path = data.get('path')
         content = data.get('content', '')
         
         if not file_path:
-            return jsonify({'success': False, 'error': 'File path is required'}), 400
+            return ojson({'success': False, 'error': 'File path is required'}, 400)
         
-        file_manager.save_file(file_path, content)
-        return jsonify({'success': True, 'message': 'File saved successfully'})
+        await file_manager.save_file_async(file_path, content)
+        return ojson({'success': True, 'message': 'File saved successfully'})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/files/<path:file_path>', methods=['GET'])
-def get_file(file_path):
+async def get_file(file_path):
     """Get file content"""
     try:
-        content = file_manager.read_file(file_path)
-        return jsonify({'success': True, 'content': content})
+        content = await file_manager.read_file_async(file_path)
+        return ojson({'success': True, 'content': content})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/files/<path:file_path>', methods=['DELETE'])
-def delete_file(file_path):
+async def delete_file(file_path):
     """Delete a file"""
     try:
-        file_manager.delete_file(file_path)
-        return jsonify({'success': True, 'message': 'File deleted successfully'})
+        await file_manager.delete_file_async(file_path)
+        return ojson({'success': True, 'message': 'File deleted successfully'})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/folders', methods=['POST'])
 def create_folder():
     """Create a new folder"""
     try:
-        data = request.get_json()
+        data = request_json()
         folder_path = data.get('path')
         
         if not folder_path:
-            return jsonify({'success': False, 'error': 'Folder path is required'}), 400
+            return ojson({'success': False, 'error': 'Folder path is required'}, 400)
         
         file_manager.create_directory(folder_path)
-        return jsonify({'success': True, 'message': 'Folder created successfully'})
+        return ojson({'success': True, 'message': 'Folder created successfully'})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/download', methods=['POST'])
 def download_workspace():
@@ -131,61 +297,80 @@ def download_workspace():
         return response
         
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/execute', methods=['POST'])
-def execute_code():
+async def execute_code():
     """Execute Python code"""
     try:
-        data = request.get_json()
+        data = request_json()
         code = data.get('code', '')
         
         if not code:
-            return jsonify({'success': False, 'error': 'Code is required'}), 400
+            return ojson({'success': False, 'error': 'Code is required'}, 400)
         
         # Execute the code
-        result = code_executor.execute(code)
+        result = await code_executor.execute_async(code)
         
         # If there's an error, get LLaMA3 suggestions
         if result.get('error'):
-            suggestions = llama_client.get_error_fixes(code, result['error'])
+            error = result['error']
+            suggestions = known_error_fixes(error)
+            if suggestions is None:
+                suggestions = cached_llm_call(
+                    'execute', code, error,
+                    lambda: llama_client.get_error_fixes(code, error)
+                )
             result['suggestions'] = suggestions
         
-        return jsonify({'success': True, 'result': result})
+        return ojson({'success': True, 'result': result})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/suggest', methods=['POST'])
 def get_suggestions():
     """Get code suggestions from LLaMA3"""
     try:
-        data = request.get_json()
+        data = request_json()
         code = data.get('code', '')
         context = data.get('context', '')
         
         if not code:
-            return jsonify({'success': False, 'error': 'Code is required'}), 400
+            return ojson({'success': False, 'error': 'Code is required'}, 400)
         
-        suggestions = llama_client.get_suggestions(code, context)
-        return jsonify({'success': True, 'suggestions': suggestions})
+        # Stream tokens as they are generated unless the client opts out
+        if data.get('stream', True):
+            return Response(
+                stream_with_context(stream_suggestions(code, context)),
+                mimetype='application/x-ndjson'
+            )
+        
+        key, embedding, suggestions = lookup_suggestions(code, context)
+        if suggestions is None:
+            suggestions = llama_client.get_suggestions(code, context)
+            remember_suggestions(key, embedding, suggestions)
+        return ojson({'success': True, 'suggestions': suggestions})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/api/analyze', methods=['POST'])
 def analyze_code():
     """Analyze code for potential issues"""
     try:
-        data = request.get_json()
+        data = request_json()
         code = data.get('code', '')
         
         if not code:
-            return jsonify({'success': False, 'error': 'Code is required'}), 400
+            return ojson({'success': False, 'error': 'Code is required'}, 400)
         
         # Get LLaMA3 analysis
-        analysis = llama_client.analyze_code(code)
-        return jsonify({'success': True, 'analysis': analysis})
+        analysis = cached_llm_call(
+            'analyze', code, '',
+            lambda: llama_client.analyze_code(code)
+        )
+        return ojson({'success': True, 'analysis': analysis})
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return ojson({'success': False, 'error': str(e)}, 500)
 
 @app.route('/static/<path:filename>')
 def static_files(filename):
@@ -194,11 +379,11 @@ def static_files(filename):
 
 @app.errorhandler(404)
 def not_found(error):
-    return jsonify({'success': False, 'error': 'Endpoint not found'}), 404
+    return ojson({'success': False, 'error': 'Endpoint not found'}, 404)
 
 @app.errorhandler(500)
 def internal_error(error):
-    return jsonify({'success': False, 'error': 'Internal server error'}), 500
+    return ojson({'success': False, 'error': 'Internal server error'}, 500)
 
 if __name__ == '__main__':
     print(f"🚀 Starting Python Code Editor...")
@@ -206,5 +391,7 @@ if __name__ == '__main__':
     print(f"🤖 Ollama API: {OLLAMA_API_URL}")
     print(f"🤖 Model: {OLLAMA_MODEL}")
     print(f"🌐 Server will be available at: http://localhost:5002")
+    print(f"💡 For production use: gunicorn -c gunicorn.conf.py app:app")
     
-    app.run(debug=True, host='0.0.0.0', port=5002)
+    # Development server only; debug mode and the reloader are opt-in via FLASK_DEBUG
+    app.run(debug=os.getenv('FLASK_DEBUG') == '1', host='0.0.0.0', port=5002)
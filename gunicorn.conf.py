@@ -0,0 +1,19 @@
+"""
+Gunicorn configuration for running the Python Code Editor in production
+
+Usage: gunicorn -c gunicorn.conf.py app:app
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv('GUNICORN_BIND', '0.0.0.0:5002')
+
+# gevent workers monkey-patch the standard library before the app is loaded,
+# so the Ollama and code-execution waits yield to other requests
+worker_class = 'gevent'
+workers = int(os.getenv('GUNICORN_WORKERS', multiprocessing.cpu_count()))
+worker_connections = int(os.getenv('GUNICORN_WORKER_CONNECTIONS', '1000'))
+
+# LLaMA3 calls can take a while on cold models
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '120'))
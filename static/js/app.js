@@ -550,10 +550,48 @@ class CodeEditor {
                 })
             });
             
-            const result = await response.json();
+            if (!response.ok) {
+                const result = await response.json();
+                console.error('Failed to get suggestions:', result.error);
+                return;
+            }
             
-            if (result.success && result.suggestions) {
-                this.displaySuggestions(result.suggestions);
+            // Suggestions arrive as newline-delimited JSON; render them as they stream in
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let text = '';
+            
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) {
+                    break;
+                }
+                
+                buffer += decoder.decode(value, { stream: true });
+                const lines = buffer.split('\n');
+                buffer = lines.pop();
+                
+                for (const line of lines) {
+                    if (!line.trim()) {
+                        continue;
+                    }
+                    
+                    const record = JSON.parse(line);
+                    if (record.error) {
+                        console.error('Failed to get suggestions:', record.error);
+                        return;
+                    }
+                    
+                    if (record.done) {
+                        this.displaySuggestions(record.suggestions);
+                        return;
+                    }
+                    
+                    text += record.response;
+                    const partial = text.split('\n').map(s => s.trim()).filter(s => s);
+                    this.displaySuggestions(partial.slice(0, 5));
+                }
             }
         } catch (error) {
             console.error('Failed to get suggestions:', error);
@@ -4,6 +4,7 @@ Test script to verify Ollama connection and API functionality
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import os
 from dotenv import load_dotenv
@@ -11,6 +12,12 @@ from dotenv import load_dotenv
 # Load environment variables
 load_dotenv()
 
+# Shared session so every check reuses pooled keep-alive connections
+SESSION = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32)
+SESSION.mount('http://', _adapter)
+SESSION.mount('https://', _adapter)
+
 def test_ollama_connection():
     """Test basic Ollama connection"""
     print("🧪 Testing Ollama Connection...")
@@ -23,7 +30,7 @@ def test_ollama_connection():
     
     try:
         # Test basic connection
-        response = requests.get(f"{ollama_url}/api/tags", timeout=10)
+        response = SESSION.get(f"{ollama_url}/api/tags", timeout=10)
         if response.status_code == 200:
             print("✓ Ollama service is accessible")
             
@@ -72,10 +79,10 @@ def test_ollama_generation():
             }
         }
         
-        response = requests.post(f"{ollama_url}/api/generate", 
-                               json=data, 
-                               headers={'Content-Type': 'application/json'},
-                               timeout=30)
+        response = SESSION.post(f"{ollama_url}/api/generate", 
+                              json=data, 
+                              headers={'Content-Type': 'application/json'},
+                              timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -125,10 +132,10 @@ Provide one specific improvement suggestion:"""
             }
         }
         
-        response = requests.post(f"{ollama_url}/api/generate", 
-                               json=data, 
-                               headers={'Content-Type': 'application/json'},
-                               timeout=30)
+        response = SESSION.post(f"{ollama_url}/api/generate", 
+                              json=data, 
+                              headers={'Content-Type': 'application/json'},
+                              timeout=30)
         
         if response.status_code == 200:
             result = response.json()
@@ -60,14 +60,27 @@ def test_utils():
     
     return True
 
+def _existing_paths(paths):
+    """Return the subset of paths that exist, scanning each parent directory once"""
+    present = set()
+    for parent in {os.path.dirname(path) for path in paths}:
+        prefix = f"{parent}/" if parent else ""
+        try:
+            with os.scandir(parent or '.') as entries:
+                present.update(prefix + entry.name for entry in entries)
+        except OSError:
+            continue
+    return present
+
 def test_directories():
     """Test if required directories exist"""
     print("\nTesting directory structure...")
     
     required_dirs = ['utils', 'templates', 'static', 'static/css', 'static/js', 'workspace']
+    present = _existing_paths(required_dirs)
     
     for dir_path in required_dirs:
-        if os.path.exists(dir_path):
+        if dir_path in present:
             print(f"✓ Directory exists: {dir_path}")
         else:
             print(f"✗ Directory missing: {dir_path}")
@@ -92,9 +105,10 @@ def test_files():
         'utils/code_executor.py',
         'utils/file_manager.py'
     ]
+    present = _existing_paths(required_files)
     
     for file_path in required_files:
-        if os.path.exists(file_path):
+        if file_path in present:
             print(f"✓ File exists: {file_path}")
         else:
             print(f"✗ File missing: {file_path}")
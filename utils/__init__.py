@@ -3,7 +3,9 @@ Utility modules for the Python Code Editor
 """
 
 from .llama_client import LlamaClient
+from .batching_llama_client import BatchingLlamaClient
 from .code_executor import CodeExecutor
 from .file_manager import FileManager
+from .response_cache import ResponseCache
 
-__all__ = ['LlamaClient', 'CodeExecutor', 'FileManager']
+__all__ = ['LlamaClient', 'BatchingLlamaClient', 'CodeExecutor', 'FileManager', 'ResponseCache']
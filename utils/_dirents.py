@@ -0,0 +1,128 @@
+"""
+Directory enumeration via the getdents64 syscall on Linux, falling back to os.scandir
+"""
+
+import ctypes
+import os
+import platform
+import stat
+import struct
+import sys
+from typing import List, Optional, Tuple
+
+# linux_dirent64 d_type values
+DT_UNKNOWN = 0
+DT_DIR = 4
+DT_REG = 8
+DT_LNK = 10
+
+_BUFFER_SIZE = 64 * 1024
+# d_ino, d_off, d_reclen, d_type in native byte order, unpadded; the NUL-terminated name follows
+_HEADER = struct.Struct('=QqHB')
+
+_SYS_GETDENTS64 = {
+    'x86_64': 217,
+    'amd64': 217,
+    'aarch64': 61,
+    'arm64': 61,
+    'riscv64': 61,
+    'ppc64le': 202,
+    'ppc64': 202,
+}
+
+def _load_syscall() -> Tuple[Optional[object], Optional[int]]:
+    """Look up libc's syscall() and the getdents64 number for this machine"""
+    if not sys.platform.startswith('linux'):
+        return None, None
+
+    number = _SYS_GETDENTS64.get(platform.machine().lower())
+    if number is None:
+        return None, None
+
+    try:
+        libc = ctypes.CDLL(None, use_errno=True)
+        syscall = libc.syscall
+    except (OSError, AttributeError):
+        return None, None
+
+    syscall.restype = ctypes.c_long
+    syscall.argtypes = [ctypes.c_long, ctypes.c_int, ctypes.c_void_p, ctypes.c_uint]
+    return syscall, number
+
+_syscall, _getdents64 = _load_syscall()
+
+def entry_kind(path: str) -> int:
+    """Classify a path with lstat, for file systems that report DT_UNKNOWN"""
+    try:
+        mode = os.lstat(path).st_mode
+    except OSError:
+        return DT_UNKNOWN
+
+    if stat.S_ISDIR(mode):
+        return DT_DIR
+    if stat.S_ISREG(mode):
+        return DT_REG
+    if stat.S_ISLNK(mode):
+        return DT_LNK
+    return DT_UNKNOWN
+
+def list_dir(path: str, skip_hidden: bool = False) -> List[Tuple[str, int]]:
+    """Return (name, d_type) for every entry of a directory except . and .., and dot-files if skip_hidden"""
+    if _syscall is None:
+        return _list_dir_scandir(path, skip_hidden)
+
+    entries = []
+    buffer = ctypes.create_string_buffer(_BUFFER_SIZE)
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY | getattr(os, 'O_CLOEXEC', 0))
+    try:
+        while True:
+            read = _syscall(_getdents64, fd, buffer, _BUFFER_SIZE)
+            if read < 0:
+                error = ctypes.get_errno()
+                raise OSError(error, os.strerror(error), path)
+            if read == 0:
+                break
+
+            data = ctypes.string_at(buffer, read)
+            offset = 0
+            while offset < read:
+                _, _, record_length, kind = _HEADER.unpack_from(data, offset)
+                name_start = offset + _HEADER.size
+                offset += record_length
+
+                # Test the first byte in the buffer so skipped names are never decoded
+                if data[name_start] == 0x2e:  # '.'
+                    if skip_hidden:
+                        continue
+                    name_end = data.index(b'\0', name_start)
+                    if name_end - name_start <= 2 and data[name_end - 1] == 0x2e:  # . and ..
+                        continue
+                else:
+                    name_end = data.index(b'\0', name_start)
+
+                entries.append((os.fsdecode(data[name_start:name_end]), kind))
+    finally:
+        os.close(fd)
+
+    return entries
+
+def _list_dir_scandir(path: str, skip_hidden: bool = False) -> List[Tuple[str, int]]:
+    """Portable list_dir built on the types os.scandir reports"""
+    entries = []
+    with os.scandir(path) as it:
+        for entry in it:
+            if skip_hidden and entry.name.startswith('.'):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    kind = DT_DIR
+                elif entry.is_symlink():
+                    kind = DT_LNK
+                elif entry.is_file(follow_symlinks=False):
+                    kind = DT_REG
+                else:
+                    kind = DT_UNKNOWN
+            except OSError:
+                kind = DT_UNKNOWN
+            entries.append((entry.name, kind))
+    return entries
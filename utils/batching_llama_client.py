@@ -0,0 +1,99 @@
+"""
+Micro-batching wrapper around LlamaClient
+"""
+
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict
+
+from .llama_client import LlamaClient
+
+class BatchingLlamaClient:
+    """Collects concurrent LLaMA3 requests into short windows and dispatches them together"""
+
+    def __init__(self, client: LlamaClient, max_batch: int = 8, max_wait: float = 0.08):
+        self.client = client
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        # One slot per batch item keeps concurrent Ollama calls bounded
+        self._executor = ThreadPoolExecutor(max_workers=max_batch, thread_name_prefix='ollama-batch')
+        self._dispatcher = None
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        # Everything that is not batched goes straight to the wrapped client
+        return getattr(self.client, name)
+
+    def get_suggestions(self, code: str, context: str = "") -> List[str]:
+        """Get code suggestions from LLaMA3"""
+        return self._submit('get_suggestions', code, context)
+
+    def get_error_fixes(self, code: str, error: str) -> List[str]:
+        """Get fix suggestions for Python errors"""
+        return self._submit('get_error_fixes', code, error)
+
+    def analyze_code(self, code: str) -> Dict:
+        """Analyze code for potential issues and improvements"""
+        return self._submit('analyze_code', code)
+
+    def _submit(self, method: str, *args):
+        """Queue a request and block until its batch has been served"""
+        self._ensure_dispatcher()
+        future = Future()
+        self._queue.put((method, args, future))
+        return future.result()
+
+    def _ensure_dispatcher(self) -> None:
+        """Start the background dispatcher on first use"""
+        if self._dispatcher is not None:
+            return
+
+        with self._lock:
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(
+                    target=self._dispatch_loop, name='ollama-batcher', daemon=True
+                )
+                self._dispatcher.start()
+
+    def _dispatch_loop(self) -> None:
+        """Drain up to max_batch requests or until max_wait has passed"""
+        while True:
+            batch = [self._queue.get()]
+
+            # A lone request is sent at once; only a burst already queued behind it waits for the window
+            if self._queue.empty():
+                self._dispatch(batch)
+                continue
+
+            deadline = time.monotonic() + self.max_wait
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            self._dispatch(batch)
+
+    def _dispatch(self, batch) -> None:
+        """Send one Ollama call per request in the batch"""
+        # Requests are not merged: identical prompts from different cache namespaces
+        # must still get independent samples
+        for method, args, future in batch:
+            self._executor.submit(self._resolve, method, args, future)
+
+    def _resolve(self, method: str, args: tuple, future: Future) -> None:
+        """Run a request against the wrapped client and hand back its result"""
+        try:
+            result = getattr(self.client, method)(*args)
+        except Exception as e:
+            future.set_exception(e)
+            return
+
+        future.set_result(result)
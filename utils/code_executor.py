@@ -2,107 +2,293 @@
 Safe Python code execution utility
 """
 
+import asyncio
+import atexit
+import hashlib
+import re
 import subprocess
 import tempfile
 import os
 import sys
+import threading
 import traceback
-from typing import Dict, Any
-from io import StringIO
-import contextlib
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, Any, Optional
+from .worker_pool import WorkerPool, kill_process_group
+from . import execution_worker
+
+# Bits of the "flags" value reported by get_code_info
+FLAG_FUNCTIONS = 1
+FLAG_CLASSES = 2
+FLAG_IMPORTS = 4
+FLAG_LOOPS = 8
+FLAG_CONDITIONALS = 16
+
+# Keywords reported by get_code_info, matched in a single scan of the source
+_KEYWORD_PATTERN = re.compile(r'\b(def|class|import|from|for|while|if|elif|else)\b')
+_KEYWORD_FLAGS = {
+    'def': FLAG_FUNCTIONS,
+    'class': FLAG_CLASSES,
+    'import': FLAG_IMPORTS,
+    'from': FLAG_IMPORTS,
+    'for': FLAG_LOOPS,
+    'while': FLAG_LOOPS,
+    'if': FLAG_CONDITIONALS,
+    'elif': FLAG_CONDITIONALS,
+    'else': FLAG_CONDITIONALS,
+}
+_ALL_FLAGS = FLAG_FUNCTIONS | FLAG_CLASSES | FLAG_IMPORTS | FLAG_LOOPS | FLAG_CONDITIONALS
+_NON_BLANK_LINE_PATTERN = re.compile(r'^[^\S\n]*\S', re.MULTILINE)
+
+# Temporary script files kept open for reuse by the subprocess fallback
+_TEMP_FILE_POOL_SIZE = 4
+
+# Code objects shared by validate_code and execute, keyed by a digest of the source
+_COMPILE_CACHE = OrderedDict()
+_COMPILE_CACHE_SIZE = 256
+_COMPILE_CACHE_LOCK = threading.Lock()
+
+def _compile_user_code(code: str):
+    """Compile code once per distinct source; raises SyntaxError like compile()"""
+    key = hashlib.blake2b(code.encode('utf-8'), digest_size=16).digest()
+    with _COMPILE_CACHE_LOCK:
+        compiled = _COMPILE_CACHE.get(key)
+        if compiled is not None:
+            _COMPILE_CACHE.move_to_end(key)
+            return compiled
+    
+    compiled = compile(code, execution_worker.USER_FILENAME, 'exec')
+    with _COMPILE_CACHE_LOCK:
+        _COMPILE_CACHE[key] = compiled
+        if len(_COMPILE_CACHE) > _COMPILE_CACHE_SIZE:
+            _COMPILE_CACHE.popitem(last=False)
+    return compiled
+
+def _try_compile_user_code(code: str):
+    """Return the cached code object, or None so the runner reports the compile error itself"""
+    try:
+        return _compile_user_code(code)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # Deeply nested source overflows the compiler; the worker shows the user the traceback
+        return None
+
+@lru_cache(maxsize=256)
+def _validate_cached(code: str) -> Dict[str, Any]:
+    """Compile code once per distinct source and report syntax errors"""
+    try:
+        _compile_user_code(code)
+        return {"valid": True, "error": None}
+    except SyntaxError as e:
+        return {
+            "valid": False,
+            "error": f"Syntax error: {e.msg} at line {e.lineno}",
+            "line": e.lineno,
+            "offset": e.offset
+        }
+    except Exception as e:
+        return {
+            "valid": False,
+            "error": f"Validation error: {str(e)}"
+        }
+
+@lru_cache(maxsize=256)
+def _code_info_cached(code: str) -> Dict[str, Any]:
+    """Collect line counts and keyword usage for distinct source"""
+    flags = 0
+    for match in _KEYWORD_PATTERN.finditer(code):
+        flags |= _KEYWORD_FLAGS[match.group(1)]
+        # Stop scanning once every flag has been seen
+        if flags == _ALL_FLAGS:
+            break
+    
+    return {
+        "total_lines": code.count('\n') + 1,
+        "non_empty_lines": len(_NON_BLANK_LINE_PATTERN.findall(code)),
+        "characters": len(code),
+        "flags": flags,
+    }
 
 class CodeExecutor:
     """Safe Python code execution with sandboxing"""
     
-    def __init__(self):
+    def __init__(self, pool_size: int = 2):
         self.timeout = 5  # seconds - reduced for faster response
         self.max_output_size = 10000  # characters
         self.execution_cache = {}  # Cache for repeated code execution
         
+        # A few temporary scripts shared by all threads, truncated and rewritten for each run
+        self._free_temp_files = []  # (fd, path) ready for reuse
+        self._busy_temp_files = {}  # path -> fd of files checked out by a run
+        self._temp_files_lock = threading.Lock()
+        atexit.register(self._cleanup_temp_files)
+        
+        # Pre-warmed interpreters rely on SIGALRM and select() on pipes (POSIX only)
+        self.worker_pool = None
+        if pool_size > 0 and os.name == 'posix':
+            self.worker_pool = WorkerPool(pool_size, self.timeout)
+        
     def execute(self, code: str) -> Dict[str, Any]:
         """Execute Python code safely and return results"""
         if not code.strip():
             return {"output": "", "error": "No code provided"}
         
-        # Check cache for identical code
+        cached_result = self._get_cached_result(code)
+        if cached_result is not None:
+            return cached_result
+        
+        result = self._run_pooled(code) if self.worker_pool is not None else None
+        if result is not None:
+            self._cache_result(code, result)
+            return result
+        
+        temp_file_path = self._write_temp_file(code)
+        try:
+            # Execute the code
+            result = self._run_code(temp_file_path)
+            self._cache_result(code, result)
+            return result
+        finally:
+            self._release_temp_file(temp_file_path)
+    
+    async def execute_async(self, code: str) -> Dict[str, Any]:
+        """Execute Python code without blocking the event loop"""
+        if not code.strip():
+            return {"output": "", "error": "No code provided"}
+        
+        cached_result = self._get_cached_result(code)
+        if cached_result is not None:
+            return cached_result
+        
+        if self.worker_pool is not None:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(None, self._run_pooled, code)
+            if result is not None:
+                self._cache_result(code, result)
+                return result
+        
+        temp_file_path = self._write_temp_file(code)
+        try:
+            result = await self._run_code_async(temp_file_path)
+            self._cache_result(code, result)
+            return result
+        finally:
+            self._release_temp_file(temp_file_path)
+    
+    def _run_pooled(self, code: str) -> Optional[Dict[str, Any]]:
+        """Run code on a pre-warmed worker"""
+        try:
+            raw = self.worker_pool.run(code, _try_compile_user_code(code))
+        except Exception as e:
+            print(f"Worker pool execution failed, falling back to subprocess: {e}")
+            return None
+        
+        if raw.get("timeout"):
+            return {
+                "output": "",
+                "error": f"Code execution timed out after {self.timeout} seconds"
+            }
+        
+        return self._build_result(raw["out"], raw["err"], raw["rc"])
+    
+    def _get_cached_result(self, code: str) -> Optional[Dict[str, Any]]:
+        """Return a cached result for identical read-only code"""
         code_hash = hash(code.strip())
         if code_hash in self.execution_cache:
             cached_result = self.execution_cache[code_hash]
             # Return cached result for read-only operations
             if not self._has_side_effects(code):
                 return cached_result.copy()
+        return None
+    
+    def _cache_result(self, code: str, result: Dict[str, Any]) -> None:
+        """Cache the result for future use"""
+        if not self._has_side_effects(code):
+            self.execution_cache[hash(code.strip())] = result.copy()
+            # Limit cache size
+            if len(self.execution_cache) > 100:
+                # Remove oldest entries
+                oldest_key = next(iter(self.execution_cache))
+                del self.execution_cache[oldest_key]
+    
+    def _write_temp_file(self, code: str) -> str:
+        """Check out a reusable temporary file and write code to it"""
+        with self._temp_files_lock:
+            slot = self._free_temp_files.pop() if self._free_temp_files else None
         
-        # Create temporary file for execution
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False) as temp_file:
-            temp_file.write(code)
-            temp_file_path = temp_file.name
+        if slot is None:
+            slot = tempfile.mkstemp(suffix='.py')
+        fd, path = slot
         
         try:
-            # Execute the code
-            result = self._run_code(temp_file_path)
-            
-            # Cache the result for future use
-            if not self._has_side_effects(code):
-                self.execution_cache[code_hash] = result.copy()
-                # Limit cache size
-                if len(self.execution_cache) > 100:
-                    # Remove oldest entries
-                    oldest_key = next(iter(self.execution_cache))
-                    del self.execution_cache[oldest_key]
-            
-            return result
-        finally:
-            # Clean up temporary file
-            try:
-                os.unlink(temp_file_path)
-            except OSError:
-                pass
+            data = code.encode('utf-8')
+            os.ftruncate(fd, 0)
+            os.lseek(fd, 0, os.SEEK_SET)
+            while data:
+                data = data[os.write(fd, data):]
+        except Exception:
+            self._discard_temp_file(fd, path)
+            raise
+        
+        with self._temp_files_lock:
+            self._busy_temp_files[path] = fd
+        return path
+    
+    def _release_temp_file(self, file_path: str) -> None:
+        """Return a temporary file for reuse, or remove it once enough are kept"""
+        with self._temp_files_lock:
+            fd = self._busy_temp_files.pop(file_path, None)
+            if fd is None:
+                return
+            if len(self._free_temp_files) < _TEMP_FILE_POOL_SIZE:
+                self._free_temp_files.append((fd, file_path))
+                return
+        
+        self._discard_temp_file(fd, file_path)
+    
+    @staticmethod
+    def _discard_temp_file(fd: int, path: str) -> None:
+        """Close and remove a temporary file"""
+        try:
+            os.close(fd)
+        except OSError:
+            pass
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    
+    def _cleanup_temp_files(self) -> None:
+        """Close and remove the reusable temporary files at interpreter exit"""
+        with self._temp_files_lock:
+            slots = self._free_temp_files + [(fd, path) for path, fd in self._busy_temp_files.items()]
+            self._free_temp_files.clear()
+            self._busy_temp_files.clear()
+        
+        for fd, path in slots:
+            self._discard_temp_file(fd, path)
     
     def _run_code(self, file_path: str) -> Dict[str, Any]:
         """Run Python code from file"""
         try:
-            # Capture stdout and stderr
-            output_buffer = StringIO()
-            error_buffer = StringIO()
-            
-            with contextlib.redirect_stdout(output_buffer), contextlib.redirect_stderr(error_buffer):
-                # Execute the code
-                result = subprocess.run(
-                    [sys.executable, file_path],
-                    capture_output=True,
-                    text=True,
-                    timeout=self.timeout,
-                    cwd=os.getcwd()
-                )
-            
-            # Get output and errors
-            stdout = output_buffer.getvalue()
-            stderr = error_buffer.getvalue()
-            
-            # Combine captured output with subprocess output
-            combined_output = stdout + result.stdout
-            combined_error = stderr + result.stderr
-            
-            # Truncate output if too long
-            if len(combined_output) > self.max_output_size:
-                combined_output = combined_output[:self.max_output_size] + "\n... (output truncated)"
-            
-            if len(combined_error) > self.max_output_size:
-                combined_error = combined_error[:self.max_output_size] + "\n... (error truncated)"
+            # Execute the code in its own session so a timeout can kill its descendants too
+            process = subprocess.Popen(
+                [sys.executable, file_path],
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                cwd=os.getcwd(),
+                start_new_session=True
+            )
             
-            # Check for execution errors
-            if result.returncode != 0:
-                return {
-                    "output": combined_output,
-                    "error": combined_error or "Code execution failed",
-                    "return_code": result.returncode
-                }
+            try:
+                stdout, stderr = process.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_group(process)
+                process.communicate()
+                raise
             
-            return {
-                "output": combined_output,
-                "error": None,
-                "return_code": result.returncode
-            }
+            return self._build_result(stdout, stderr, process.returncode)
             
         except subprocess.TimeoutExpired:
             return {
@@ -120,39 +306,96 @@ class CodeExecutor:
                 "error": f"Execution error: {str(e)}"
             }
     
+    async def _run_code_async(self, file_path: str) -> Dict[str, Any]:
+        """Run Python code from file in a child process awaited on the event loop"""
+        try:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, file_path,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=os.getcwd(),
+                start_new_session=True
+            )
+        except Exception as e:
+            return {
+                "output": "",
+                "error": f"Execution error: {str(e)}"
+            }
+        
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            kill_process_group(process)
+            await process.wait()
+            return {
+                "output": "",
+                "error": f"Code execution timed out after {self.timeout} seconds"
+            }
+        
+        return self._build_result(
+            stdout.decode('utf-8', errors='replace'),
+            stderr.decode('utf-8', errors='replace'),
+            process.returncode
+        )
+    
+    def _build_result(self, output: str, error: str, return_code: int,
+                      failure_message: str = "Code execution failed") -> Dict[str, Any]:
+        """Truncate captured streams and shape the execution result"""
+        # Truncate output if too long
+        if len(output) > self.max_output_size:
+            output = output[:self.max_output_size] + "\n... (output truncated)"
+        
+        if len(error) > self.max_output_size:
+            error = error[:self.max_output_size] + "\n... (error truncated)"
+        
+        # Check for execution errors
+        if return_code != 0:
+            return {
+                "output": output,
+                "error": error or failure_message,
+                "return_code": return_code
+            }
+        
+        return {
+            "output": output,
+            "error": None,
+            "return_code": return_code
+        }
+    
     def execute_interactive(self, code: str) -> Dict[str, Any]:
         """Execute code in interactive mode (for REPL-like behavior)"""
+        return asyncio.run(self.execute_interactive_async(code))
+    
+    async def execute_interactive_async(self, code: str) -> Dict[str, Any]:
+        """Execute code in interactive mode without blocking the event loop"""
         try:
             # Create a new Python process
-            process = subprocess.Popen(
-                [sys.executable, '-i', '-c', code],
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                timeout=self.timeout
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, '-i', '-c', code,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
             )
             
-            stdout, stderr = process.communicate(timeout=self.timeout)
-            
-            if process.returncode != 0:
+            try:
+                # Empty input closes stdin so the REPL exits after running the code
+                stdout, stderr = await asyncio.wait_for(process.communicate(b''), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                kill_process_group(process)
+                await process.wait()
                 return {
-                    "output": stdout,
-                    "error": stderr or "Interactive execution failed",
-                    "return_code": process.returncode
+                    "output": "",
+                    "error": f"Interactive execution timed out after {self.timeout} seconds"
                 }
             
-            return {
-                "output": stdout,
-                "error": None,
-                "return_code": process.returncode
-            }
+            return self._build_result(
+                stdout.decode('utf-8', errors='replace'),
+                stderr.decode('utf-8', errors='replace'),
+                process.returncode,
+                failure_message="Interactive execution failed"
+            )
             
-        except subprocess.TimeoutExpired:
-            return {
-                "output": "",
-                "error": f"Interactive execution timed out after {self.timeout} seconds"
-            }
         except Exception as e:
             return {
                 "output": "",
@@ -161,37 +404,11 @@ class CodeExecutor:
     
     def validate_code(self, code: str) -> Dict[str, Any]:
         """Validate Python code syntax without execution"""
-        try:
-            compile(code, '<string>', 'exec')
-            return {"valid": True, "error": None}
-        except SyntaxError as e:
-            return {
-                "valid": False,
-                "error": f"Syntax error: {e.msg} at line {e.lineno}",
-                "line": e.lineno,
-                "offset": e.offset
-            }
-        except Exception as e:
-            return {
-                "valid": False,
-                "error": f"Validation error: {str(e)}"
-            }
+        return dict(_validate_cached(code))
     
     def get_code_info(self, code: str) -> Dict[str, Any]:
         """Get information about the code without execution"""
-        lines = code.split('\n')
-        non_empty_lines = [line for line in lines if line.strip()]
-        
-        return {
-            "total_lines": len(lines),
-            "non_empty_lines": len(non_empty_lines),
-            "characters": len(code),
-            "has_functions": "def " in code,
-            "has_classes": "class " in code,
-            "has_imports": any(keyword in code for keyword in ["import ", "from "]),
-            "has_loops": any(keyword in code for keyword in ["for ", "while "]),
-            "has_conditionals": any(keyword in code for keyword in ["if ", "elif ", "else:"]),
-        }
+        return dict(_code_info_cached(code))
     
     def _has_side_effects(self, code: str) -> bool:
         """Check if code has potential side effects (file I/O, network, etc.)"""
@@ -0,0 +1,126 @@
+"""
+Pre-warmed Python worker used by WorkerPool
+
+Each worker runs exactly one request so no state leaks between runs. The
+request is framed as a '>II' header (bytecode length, source length)
+followed by marshalled bytecode and the UTF-8 source on stdin. An empty
+bytecode part means the parent could not compile the source and the
+worker compiles it itself. User code writes to the worker's real stdout
+and stderr, so file-descriptor level output and child processes are
+captured just like a fresh interpreter. The result is written as one
+JSON line to a private reply descriptor.
+Run as: python -u execution_worker.py <timeout> <reply fd>
+"""
+
+import builtins
+import json
+import linecache
+import marshal
+import os
+import signal
+import struct
+import sys
+import traceback
+
+USER_FILENAME = '<user>'
+
+class ExecutionTimeout(BaseException):
+    """Raised inside user code when the alarm fires"""
+
+def _on_alarm(signum, frame):
+    raise ExecutionTimeout()
+
+def install_timeout_handler() -> None:
+    """Turn SIGALRM into ExecutionTimeout inside user code"""
+    signal.signal(signal.SIGALRM, _on_alarm)
+
+def run_user_code(code: str, timeout: int, compiled=None) -> dict:
+    """Execute code (or its precompiled code object) in fresh globals
+
+    Output goes to the process's own stdout and stderr.
+    """
+    return_code = 0
+    timed_out = False
+    cwd = os.getcwd()
+
+    # Register the source so tracebacks can show the offending lines
+    linecache.cache[USER_FILENAME] = (len(code), None, code.splitlines(True), USER_FILENAME)
+    user_globals = {'__name__': '__main__', '__builtins__': builtins}
+
+    signal.alarm(timeout)
+    try:
+        try:
+            if compiled is None:
+                compiled = compile(code, USER_FILENAME, 'exec')
+            exec(compiled, user_globals)
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                return_code = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                return_code = 1
+        except ExecutionTimeout:
+            timed_out = True
+        except BaseException as e:
+            # Drop this module's frame so the traceback starts at user code
+            tb = e.__traceback__.tb_next if e.__traceback__ else None
+            sys.stderr.write(''.join(traceback.format_exception(type(e), e, tb)))
+            return_code = 1
+    except ExecutionTimeout:
+        timed_out = True
+    finally:
+        signal.alarm(0)
+        try:
+            os.chdir(cwd)
+        except OSError:
+            pass
+
+    return {
+        "rc": return_code,
+        "timeout": timed_out
+    }
+
+def main():
+    timeout = int(sys.argv[1])
+    reply_fd = int(sys.argv[2])
+
+    # The reply channel stays private to this process; user code's children do not inherit it
+    os.set_inheritable(reply_fd, False)
+    install_timeout_handler()
+    # Output that is not valid UTF-8 (e.g. lone surrogates) is replaced rather than raising
+    sys.stdout.reconfigure(errors='replace')
+    sys.stderr.reconfigure(errors='replace')
+
+    # Bind what the reply needs now, before user code can monkeypatch modules
+    dumps = json.dumps
+    write = os.write
+    close = os.close
+    streams = (sys.__stdout__, sys.__stderr__)
+
+    requests_in = sys.stdin.buffer
+    header = requests_in.read(8)
+    if len(header) < 8:
+        return
+
+    bytecode_length, source_length = struct.unpack('>II', header)
+    bytecode = requests_in.read(bytecode_length)
+    code = requests_in.read(source_length).decode('utf-8')
+
+    # Loading the parent's bytecode skips tokenizing and parsing here
+    compiled = marshal.loads(bytecode) if bytecode else None
+    result = run_user_code(code, timeout, compiled)
+    for stream in streams:
+        try:
+            stream.flush()
+        except (OSError, ValueError):
+            pass
+
+    reply = dumps({"rc": result["rc"], "timeout": result["timeout"]}).encode('utf-8') + b'\n'
+    try:
+        while reply:
+            reply = reply[write(reply_fd, reply):]
+    finally:
+        close(reply_fd)
+
+if __name__ == '__main__':
+    main()
@@ -2,97 +2,227 @@
 LLaMA3 API client for code suggestions and analysis
 """
 
+import atexit
+import threading
+import time
+from contextlib import closing
 import requests
-import json
-from typing import List, Dict, Optional
+import orjson
+from requests.adapters import HTTPAdapter
+from typing import List, Dict, Optional, Iterator
+
+# Prompts keep their static text at module level; only code, context and error are filled in
+_SUGGEST_TEMPLATE = """
+        You are a Python programming assistant. Based on the following code and context, provide helpful suggestions for code completion or improvement.
+        
+        Context: {context}
+        Code:
+        {code}
+        
+        Provide 3-5 specific, actionable suggestions for improving or completing this code. Focus on Python best practices, readability, and functionality.
+        """
+
+_ERROR_FIX_TEMPLATE = """
+        You are a Python debugging expert. The following code has an error. Please provide specific fixes.
+        
+        Code:
+        {code}
+        
+        Error:
+        {error}
+        
+        Provide 3-5 specific, actionable fixes for this error. Include corrected code snippets and explanations.
+        """
+
+_ANALYZE_TEMPLATE = """
+        You are a Python code reviewer. Analyze the following code for:
+        1. Potential bugs or errors
+        2. Code quality issues
+        3. Performance improvements
+        4. Best practices violations
+        5. Security concerns
+        
+        Code:
+        {code}
+        
+        Provide a comprehensive analysis with specific recommendations.
+        """
+
+_SUGGEST_OPTIONS = {"temperature": 0.3, "top_p": 0.9, "num_predict": 500}
+_ERROR_FIX_OPTIONS = {"temperature": 0.2, "top_p": 0.9, "num_predict": 600}
+_ANALYZE_OPTIONS = {"temperature": 0.1, "top_p": 0.9, "num_predict": 800}
+
+# How long test_connection trusts its last answer, in seconds
+_CONNECTION_OK_TTL = 5.0
+_CONNECTION_FAILED_TTL = 1.0
+
+# How long Ollama keeps a model loaded after each request
+_KEEP_ALIVE = "10m"
 
 class LlamaClient:
     """Client for interacting with Ollama API"""
     
-    def __init__(self, api_url: str, model: str = "llama3"):
+    def __init__(self, api_url: str, model: str = "llama3", embed_model: str = "nomic-embed-text",
+                 pool_maxsize: int = 8, keep_alive: str = _KEEP_ALIVE, preload: bool = True):
         self.api_url = api_url.rstrip('/')
         self.model = model
+        self.embed_model = embed_model
+        self.keep_alive = keep_alive
+        self._connection_ok = False
+        self._connection_checked_until = 0.0
         self.headers = {
             'Content-Type': 'application/json'
         }
+        
+        # Reuse keep-alive connections to Ollama instead of reconnecting per call
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_maxsize, max_retries=0)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        atexit.register(self.close)
+        
+        if preload:
+            # Load the model in the background so the first real request skips the load time
+            threading.Thread(target=self._preload, name='ollama-preload', daemon=True).start()
+    
+    def close(self) -> None:
+        """Close pooled connections to the Ollama API"""
+        self._session.close()
+    
+    def _preload(self) -> None:
+        """Ask Ollama to load the model without generating anything"""
+        data = {
+            "model": self.model,
+            "prompt": "",
+            "keep_alive": self.keep_alive
+        }
+        
+        try:
+            self._session.post(f"{self.api_url}/api/generate", headers=self.headers,
+                               data=orjson.dumps(data), timeout=2).close()
+        except requests.exceptions.RequestException:
+            pass
     
     def _make_request(self, endpoint: str, data: Dict) -> Dict:
         """Make a request to the Ollama API"""
         try:
             url = f"{self.api_url}{endpoint}"
-            response = requests.post(url, headers=self.headers, json=data, timeout=30)
+            response = self._session.post(url, headers=self.headers, data=orjson.dumps(data), timeout=30)
             response.raise_for_status()
-            return response.json()
+            return orjson.loads(response.content)
         except requests.exceptions.RequestException as e:
             print(f"Ollama API request failed: {e}")
             return {"error": str(e)}
-        except json.JSONDecodeError as e:
+        except orjson.JSONDecodeError as e:
             print(f"Failed to parse Ollama response: {e}")
             return {"error": "Invalid response format"}
     
-    def get_suggestions(self, code: str, context: str = "") -> List[str]:
-        """Get code suggestions from LLaMA3"""
-        prompt = f"""
-        You are a Python programming assistant. Based on the following code and context, provide helpful suggestions for code completion or improvement.
+    def _stream_request(self, endpoint: str, data: Dict) -> Iterator[Dict]:
+        """Make a streaming request to the Ollama API, yielding each JSON chunk"""
+        try:
+            url = f"{self.api_url}{endpoint}"
+            with self._session.post(url, headers=self.headers, data=orjson.dumps(data), stream=True, timeout=30) as response:
+                response.raise_for_status()
+                for line in response.iter_lines():
+                    if line:
+                        yield orjson.loads(line)
+        except requests.exceptions.RequestException as e:
+            print(f"Ollama API request failed: {e}")
+            yield {"error": str(e)}
+        except orjson.JSONDecodeError as e:
+            print(f"Failed to parse Ollama response: {e}")
+            yield {"error": "Invalid response format"}
+    
+    def _generate_lines(self, data: Dict, limit: int) -> Dict:
+        """Stream a completion, stopping once limit non-empty lines have been generated"""
+        parts = []
+        pending = ""
+        complete = 0
         
-        Context: {context}
-        Code:
-        {code}
+        # Closing the stream early makes Ollama stop generating the tail
+        with closing(self._stream_request("/api/generate", data)) as chunks:
+            for chunk in chunks:
+                if "error" in chunk:
+                    return chunk
+                
+                text = chunk.get("response")
+                if text:
+                    parts.append(text)
+                    *lines, pending = (pending + text).split('\n')
+                    complete += sum(1 for line in lines if line.strip())
+                    if complete >= limit:
+                        break
+                
+                if chunk.get("done"):
+                    break
         
-        Provide 3-5 specific, actionable suggestions for improving or completing this code. Focus on Python best practices, readability, and functionality.
-        """
+        return {"response": ''.join(parts)}
+    
+    def _suggestions_request(self, code: str, context: str, stream: bool) -> Dict:
+        """Build the generate request used for code suggestions"""
+        prompt = _SUGGEST_TEMPLATE.format_map({"context": context, "code": code})
         
-        data = {
+        return {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.3,
-                "top_p": 0.9,
-                "num_predict": 500
-            }
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": _SUGGEST_OPTIONS
         }
-        
-        response = self._make_request("/api/generate", data)
+    
+    @staticmethod
+    def split_suggestions(text: str) -> List[str]:
+        """Split a completion into individual suggestions"""
+        suggestions = [s.strip() for s in text.split('\n') if s.strip()]
+        return suggestions[:5] if suggestions else ["No suggestions available"]
+    
+    def get_suggestions(self, code: str, context: str = "") -> List[str]:
+        """Get code suggestions from LLaMA3"""
+        data = self._suggestions_request(code, context, stream=True)
+        response = self._generate_lines(data, limit=5)
         
         if "error" in response:
             return [f"Error getting suggestions: {response['error']}"]
         
         # Parse suggestions from response
-        suggestions = []
-        if "response" in response:
-            text = response["response"]
-            # Split into individual suggestions
-            suggestions = [s.strip() for s in text.split('\n') if s.strip()]
+        return self.split_suggestions(response.get("response", ""))
+    
+    def stream_suggestions(self, code: str, context: str = "") -> Iterator[str]:
+        """Yield suggestion text from LLaMA3 as it is generated, stopping after five lines"""
+        data = self._suggestions_request(code, context, stream=True)
+        pending = ""
+        complete = 0
         
-        return suggestions[:5] if suggestions else ["No suggestions available"]
+        # Only five suggestions are kept, so close the stream and stop generation once they are in
+        with closing(self._stream_request("/api/generate", data)) as chunks:
+            for chunk in chunks:
+                if "error" in chunk:
+                    raise RuntimeError(f"Error getting suggestions: {chunk['error']}")
+                
+                text = chunk.get("response")
+                if text:
+                    yield text
+                    *lines, pending = (pending + text).split('\n')
+                    complete += sum(1 for line in lines if line.strip())
+                    if complete >= 5:
+                        break
+                
+                if chunk.get("done"):
+                    break
     
     def get_error_fixes(self, code: str, error: str) -> List[str]:
         """Get fix suggestions for Python errors"""
-        prompt = f"""
-        You are a Python debugging expert. The following code has an error. Please provide specific fixes.
-        
-        Code:
-        {code}
-        
-        Error:
-        {error}
-        
-        Provide 3-5 specific, actionable fixes for this error. Include corrected code snippets and explanations.
-        """
+        prompt = _ERROR_FIX_TEMPLATE.format_map({"code": code, "error": error})
         
         data = {
             "model": self.model,
             "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": 0.2,
-                "top_p": 0.9,
-                "num_predict": 600
-            }
+            "stream": True,
+            "keep_alive": self.keep_alive,
+            "options": _ERROR_FIX_OPTIONS
         }
         
-        response = self._make_request("/api/generate", data)
+        response = self._generate_lines(data, limit=5)
         
         if "error" in response:
             return [f"Error getting fixes: {response['error']}"]
@@ -108,29 +238,14 @@ class LlamaClient:
     
     def analyze_code(self, code: str) -> Dict:
         """Analyze code for potential issues and improvements"""
-        prompt = f"""
-        You are a Python code reviewer. Analyze the following code for:
-        1. Potential bugs or errors
-        2. Code quality issues
-        3. Performance improvements
-        4. Best practices violations
-        5. Security concerns
-        
-        Code:
-        {code}
-        
-        Provide a comprehensive analysis with specific recommendations.
-        """
+        prompt = _ANALYZE_TEMPLATE.format_map({"code": code})
         
         data = {
             "model": self.model,
             "prompt": prompt,
             "stream": False,
-            "options": {
-                "temperature": 0.1,
-                "top_p": 0.9,
-                "num_predict": 800
-            }
+            "keep_alive": self.keep_alive,
+            "options": _ANALYZE_OPTIONS
         }
         
         response = self._make_request("/api/generate", data)
@@ -151,13 +266,37 @@ class LlamaClient:
         
         return analysis
     
+    def get_embedding(self, text: str) -> Optional[List[float]]:
+        """Embed text with the configured embedding model"""
+        data = {
+            "model": self.embed_model,
+            "prompt": text,
+            "keep_alive": self.keep_alive
+        }
+        
+        response = self._make_request("/api/embeddings", data)
+        return response.get("embedding") or None
+    
     def test_connection(self) -> bool:
-        """Test if Ollama API is accessible"""
+        """Test if Ollama API is accessible, reusing a recent answer"""
+        now = time.monotonic()
+        if now < self._connection_checked_until:
+            return self._connection_ok
+        
+        ok = self._ping()
+        # Failures expire sooner so a recovered backend is noticed quickly
+        self._connection_ok = ok
+        self._connection_checked_until = now + (_CONNECTION_OK_TTL if ok else _CONNECTION_FAILED_TTL)
+        return ok
+    
+    def _ping(self) -> bool:
+        """Send a tiny generation request to check the API"""
         try:
             data = {
                 "model": self.model,
                 "prompt": "Hello",
                 "stream": False,
+                "keep_alive": self.keep_alive,
                 "options": {
                     "num_predict": 10
                 }
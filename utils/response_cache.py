@@ -0,0 +1,119 @@
+"""
+Content-addressed response cache for LLaMA3 endpoints
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+
+class ResponseCache:
+    """In-memory LRU cache of LLM responses, persisted to SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None, maxsize: int = 512):
+        self.maxsize = maxsize
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._touched = set()  # keys served from memory since the last write to disk
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            self._open_db(db_path)
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Build a cache key from the SHA-256 of the request parts"""
+        # Length-prefix each part so no two different part lists encode to the same string
+        encoded = "".join(f"{len(part)}:{part}" for part in parts)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None on a miss"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                if self._db is not None:
+                    self._touched.add(key)
+                return self._entries[key]
+
+            if self._db is None:
+                return None
+
+            row = self._db.execute(
+                "SELECT value FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value = json.loads(row[0])
+            self._remember(key, value)
+            self._touched.add(key)
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        """Store value under key in memory and on disk"""
+        with self._lock:
+            self._remember(key, value)
+
+            if self._db is not None:
+                now = int(time.time())
+                touched = [(now, touched_key) for touched_key in self._touched]
+                self._touched.clear()
+                try:
+                    # Record recent hits so pruning drops the least recently used rows
+                    self._db.executemany("UPDATE responses SET ts = ? WHERE key = ?", touched)
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO responses (key, value, ts) VALUES (?, ?, ?)",
+                        (key, json.dumps(value).encode('utf-8'), now)
+                    )
+                    self._prune()
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"Failed to persist cached response: {e}")
+
+    def clear(self) -> None:
+        """Drop all cached responses"""
+        with self._lock:
+            self._entries.clear()
+            self._touched.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM responses")
+                self._db.commit()
+
+    def _remember(self, key: str, value: Any) -> None:
+        """Insert into the in-memory LRU, evicting the oldest entry if full"""
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _prune(self) -> None:
+        """Keep only the maxsize most recently used rows on disk"""
+        self._db.execute(
+            "DELETE FROM responses WHERE key IN "
+            "(SELECT key FROM responses ORDER BY ts DESC, rowid DESC LIMIT -1 OFFSET ?)", (self.maxsize,)
+        )
+
+    def _open_db(self, db_path: str) -> None:
+        """Open (and create if needed) the SQLite backing store"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Route handlers run on several threads; access is serialized by self._lock
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, value BLOB, ts INTEGER)"
+            )
+            self._prune()
+            self._db.commit()
+        except sqlite3.Error as e:
+            print(f"Response cache persistence disabled: {e}")
+            self._db = None
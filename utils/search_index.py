@@ -0,0 +1,97 @@
+"""
+Byte-set index that lets content search skip files which cannot match
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Container, Optional
+
+# Files above this size are always scanned rather than indexed
+MAX_INDEXED_SIZE = 256 * 1024
+
+def byte_bitmap(data: bytes) -> int:
+    """256-bit mask of the distinct ASCII-lowercased bytes in data"""
+    bits = 0
+    for byte in set(data.lower()):
+        bits |= 1 << byte
+    return bits
+
+class SearchIndex:
+    """Per-file byte bitmaps keyed by path and validated by mtime and size, persisted to SQLite"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self._entries = {}  # path -> (mtime_ns, size, bitmap)
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            self._open_db(db_path)
+
+    def get(self, path: str, mtime_ns: int, size: int) -> Optional[int]:
+        """Return the bitmap for path if it was built from the same version of the file"""
+        entry = self._entries.get(path)
+        if entry is None or entry[0] != mtime_ns or entry[1] != size:
+            return None
+        return entry[2]
+
+    def put(self, path: str, mtime_ns: int, size: int, bitmap: int) -> None:
+        """Record the bitmap for this version of path; written to disk on flush"""
+        with self._lock:
+            self._entries[path] = (mtime_ns, size, bitmap)
+            self._pending[path] = (mtime_ns, size, bitmap)
+
+    def flush(self, live_paths: Optional[Container[str]] = None) -> None:
+        """Persist bitmaps recorded since the last flush
+
+        When live_paths is given (every file seen by a full walk), entries for
+        other paths belong to deleted or renamed files and are dropped.
+        """
+        with self._lock:
+            stale = []
+            if live_paths is not None:
+                stale = [path for path in self._entries if path not in live_paths]
+                for path in stale:
+                    del self._entries[path]
+                    self._pending.pop(path, None)
+
+            if (not self._pending and not stale) or self._db is None:
+                self._pending.clear()
+                return
+
+            rows = [(path, mtime_ns, size, bitmap.to_bytes(32, 'little'))
+                    for path, (mtime_ns, size, bitmap) in self._pending.items()]
+            self._pending.clear()
+            try:
+                self._db.executemany("DELETE FROM file_bytes WHERE path = ?", ((path,) for path in stale))
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO file_bytes (path, mtime_ns, size, bitmap) VALUES (?, ?, ?, ?)",
+                    rows
+                )
+                self._db.commit()
+            except sqlite3.Error as e:
+                print(f"Failed to persist search index: {e}")
+
+    def _open_db(self, db_path: str) -> None:
+        """Open the SQLite store and load every recorded bitmap"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Searches run content checks on several threads; writes are serialized by self._lock
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS file_bytes "
+                "(path TEXT PRIMARY KEY, mtime_ns INTEGER, size INTEGER, bitmap BLOB)"
+            )
+            self._db.commit()
+
+            for path, mtime_ns, size, bitmap in self._db.execute(
+                "SELECT path, mtime_ns, size, bitmap FROM file_bytes"
+            ):
+                self._entries[path] = (mtime_ns, size, int.from_bytes(bitmap, 'little'))
+        except sqlite3.Error as e:
+            print(f"Search index persistence disabled: {e}")
+            self._db = None
@@ -0,0 +1,119 @@
+"""
+Embedding-similarity cache for LLaMA3 suggestions
+"""
+
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from collections import deque
+from operator import mul
+from typing import Any, List, Optional
+
+class SemanticCache:
+    """Returns cached values for inputs whose embeddings are nearly identical"""
+
+    def __init__(self, db_path: Optional[str] = None, model: str = "",
+                 threshold: float = 0.95, maxsize: int = 512):
+        self.model = model
+        self.threshold = threshold
+        self.maxsize = maxsize
+        self._entries = deque()  # (row id, namespace, unit vector, value), oldest first
+        self._lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            self._open_db(db_path)
+
+    def lookup(self, embedding: List[float], namespace: str = "") -> Optional[Any]:
+        """Return the value of the most similar entry in namespace above the threshold"""
+        query = self._normalize(embedding)
+        if query is None:
+            return None
+
+        # Scan a snapshot so concurrent lookups and adds do not wait on each other
+        with self._lock:
+            entries = tuple(self._entries)
+
+        best_score = self.threshold
+        best_value = None
+        for _, entry_namespace, vector, value in entries:
+            if entry_namespace != namespace or len(vector) != len(query):
+                continue
+            # Vectors are unit length, so the dot product is the cosine similarity
+            score = sum(map(mul, query, vector))
+            if score >= best_score:
+                best_score = score
+                best_value = value
+
+        return best_value
+
+    def add(self, embedding: List[float], value: Any, namespace: str = "") -> None:
+        """Remember value for this embedding within namespace"""
+        vector = self._normalize(embedding)
+        if vector is None:
+            return
+
+        with self._lock:
+            row_id = None
+            if self._db is not None:
+                try:
+                    cursor = self._db.execute(
+                        "INSERT INTO semantic_entries (model, namespace, embedding, value, ts) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (self.model, namespace, vector.tobytes(),
+                         json.dumps(value).encode('utf-8'), int(time.time()))
+                    )
+                    self._db.commit()
+                    row_id = cursor.lastrowid
+                except sqlite3.Error as e:
+                    print(f"Failed to persist semantic cache entry: {e}")
+
+            self._entries.append((row_id, namespace, vector, value))
+            while len(self._entries) > self.maxsize:
+                evicted_id = self._entries.popleft()[0]
+                if evicted_id is not None and self._db is not None:
+                    self._db.execute("DELETE FROM semantic_entries WHERE id = ?", (evicted_id,))
+                    self._db.commit()
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[array]:
+        """Scale an embedding to unit length"""
+        norm = math.sqrt(sum(x * x for x in embedding))
+        if not norm:
+            return None
+        return array('f', (x / norm for x in embedding))
+
+    def _open_db(self, db_path: str) -> None:
+        """Open the SQLite store and load the most recent entries for this model"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # Route handlers run on several threads; access is serialized by self._lock
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS semantic_entries "
+                "(id INTEGER PRIMARY KEY AUTOINCREMENT, model TEXT, namespace TEXT DEFAULT '', "
+                "embedding BLOB, value BLOB, ts INTEGER)"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(semantic_entries)")}
+            if 'namespace' not in columns:
+                self._db.execute("ALTER TABLE semantic_entries ADD COLUMN namespace TEXT DEFAULT ''")
+            self._db.commit()
+
+            rows = self._db.execute(
+                "SELECT id, namespace, embedding, value FROM semantic_entries WHERE model = ? "
+                "ORDER BY id DESC LIMIT ?", (self.model, self.maxsize)
+            ).fetchall()
+            for row_id, namespace, blob, value in reversed(rows):
+                vector = array('f')
+                vector.frombytes(blob)
+                self._entries.append((row_id, namespace or '', vector, json.loads(value)))
+        except sqlite3.Error as e:
+            print(f"Semantic cache persistence disabled: {e}")
+            self._db = None
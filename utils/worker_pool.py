@@ -0,0 +1,217 @@
+"""
+Pool of pre-warmed Python interpreters for fast code execution
+"""
+
+import json
+import marshal
+import os
+import queue
+import signal
+import struct
+import subprocess
+import sys
+import threading
+from typing import Dict, Any
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'execution_worker.py')
+
+def kill_process_group(process) -> None:
+    """Kill a child started with start_new_session=True along with everything it spawned"""
+    try:
+        if hasattr(os, 'killpg'):
+            os.killpg(process.pid, signal.SIGKILL)
+            return
+    except OSError:
+        pass
+
+    try:
+        process.kill()
+    except (OSError, ProcessLookupError):
+        pass
+
+class WorkerPool:
+    """Keeps idle interpreters started ahead of time so executions skip interpreter startup
+
+    Every worker runs a single request and is then replaced in the background,
+    so nothing one user's code changes can reach the next run.
+    """
+
+    def __init__(self, size: int = 2, timeout: int = 5):
+        self.size = size
+        self.timeout = timeout
+        self._idle = queue.Queue()
+        self._spawned = 0
+        self._lock = threading.Lock()
+
+        # Warm the pool in the background so the first execution finds a worker waiting
+        self._replenish()
+
+    def run(self, code: str, compiled=None) -> Dict[str, Any]:
+        """Run code on an idle worker and return its raw result
+
+        Raises only if no worker could be started; once the request has been
+        handed to a worker, every failure is reported in the result so the
+        code is never run twice.
+        """
+        worker = self._acquire()
+        try:
+            return self._send(worker, code, compiled)
+        finally:
+            self._retire(worker)
+            self._replenish()
+
+    def shutdown(self) -> None:
+        """Stop all idle workers"""
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._retire(worker)
+
+    def _acquire(self) -> subprocess.Popen:
+        """Take an idle worker, starting a new one while below pool size, else wait for one"""
+        block = False
+        while True:
+            try:
+                worker = self._idle.get(timeout=0.5) if block else self._idle.get_nowait()
+            except queue.Empty:
+                worker = None
+
+            if worker is not None:
+                # A worker that died while idle never saw a request and can be replaced
+                if worker.poll() is None:
+                    return worker
+                self._retire(worker)
+                continue
+
+            with self._lock:
+                if self._spawned < self.size:
+                    self._spawned += 1
+                    break
+            # Every slot is busy or still starting, so wait for one to free up
+            block = True
+
+        try:
+            return self._spawn()
+        except Exception:
+            with self._lock:
+                self._spawned -= 1
+            raise
+
+    def _replenish(self) -> None:
+        """Start replacement workers in the background until the pool is full"""
+        with self._lock:
+            missing = self.size - self._spawned
+            self._spawned += max(missing, 0)
+
+        for _ in range(missing):
+            threading.Thread(target=self._spawn_idle, name='worker-pool-spawn', daemon=True).start()
+
+    def _spawn_idle(self) -> None:
+        """Start a worker and park it in the idle queue"""
+        try:
+            self._idle.put(self._spawn())
+        except Exception as e:
+            print(f"Failed to start execution worker: {e}")
+            with self._lock:
+                self._spawned -= 1
+
+    def _spawn(self) -> subprocess.Popen:
+        """Start a worker interpreter with a private pipe for its reply"""
+        reply_read, reply_write = os.pipe()
+        try:
+            worker = subprocess.Popen(
+                [sys.executable, '-u', WORKER_SCRIPT, str(self.timeout), str(reply_write)],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=os.getcwd(),
+                pass_fds=(reply_write,),
+                start_new_session=True
+            )
+        except Exception:
+            os.close(reply_read)
+            raise
+        finally:
+            os.close(reply_write)
+
+        worker.reply_fd = reply_read
+        return worker
+
+    def _retire(self, worker: subprocess.Popen) -> None:
+        """Kill a worker and free its slot"""
+        kill_process_group(worker)
+        try:
+            worker.wait()
+        except OSError:
+            pass
+
+        for stream in (worker.stdin, worker.stdout, worker.stderr):
+            try:
+                stream.close()
+            except OSError:
+                pass
+        if worker.reply_fd is not None:
+            os.close(worker.reply_fd)
+            worker.reply_fd = None
+
+        with self._lock:
+            self._spawned -= 1
+
+    def _send(self, worker: subprocess.Popen, code: str, compiled=None) -> Dict[str, Any]:
+        """Hand framed bytecode and source to a worker and collect its output and reply"""
+        bytecode = marshal.dumps(compiled) if compiled is not None else b''
+        source = code.encode('utf-8')
+        request = struct.pack('>II', len(bytecode), len(source)) + bytecode + source
+
+        timed_out = False
+        try:
+            # The worker enforces the timeout itself; this guards against it hanging in C code
+            stdout, stderr = worker.communicate(request, timeout=self.timeout + 1)
+        except subprocess.TimeoutExpired:
+            kill_process_group(worker)
+            stdout, stderr = worker.communicate()
+            timed_out = True
+        except Exception as e:
+            kill_process_group(worker)
+            return {"out": "", "err": f"Execution worker failed: {e}", "rc": 1, "timeout": False}
+
+        reply = self._read_reply(worker)
+        output = stdout.decode('utf-8', errors='replace')
+        error = stderr.decode('utf-8', errors='replace')
+
+        if reply is None:
+            if timed_out:
+                return {"out": output, "err": error, "rc": None, "timeout": True}
+            # The worker exited without reporting (os._exit, a crash, a corrupted reply)
+            return {"out": output, "err": error, "rc": worker.returncode or 1, "timeout": False}
+
+        return {
+            "out": output,
+            "err": error,
+            "rc": reply.get("rc", 1),
+            "timeout": bool(reply.get("timeout"))
+        }
+
+    @staticmethod
+    def _read_reply(worker: subprocess.Popen):
+        """Read the worker's JSON reply without blocking, or None if it sent none"""
+        os.set_blocking(worker.reply_fd, False)
+        chunks = []
+        while True:
+            try:
+                chunk = os.read(worker.reply_fd, 65536)
+            except BlockingIOError:
+                break
+            except OSError:
+                return None
+            if not chunk:
+                break
+            chunks.append(chunk)
+
+        try:
+            reply = json.loads(b''.join(chunks))
+        except ValueError:
+            return None
+        return reply if isinstance(reply, dict) else None